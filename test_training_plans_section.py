@@ -2,14 +2,22 @@
 """
 Regression tests for training_plans_section.py module (on-demand model).
 
-Run: python3 test_training_plans_section.py
+Run: python3 -m pytest test_training_plans_section.py
 """
 
 import sys
+from html import escape
+
+import pytest
+
 from training_plans_section import (
+    TrainingPlansSpec,
+    generate_from,
     generate_training_plans_section,
+    generate_training_plans_section_bytes,
     generate_training_plans_html,
-    get_training_plans_css
+    get_training_plans_css,
+    write_training_plans_css
 )
 
 
@@ -28,110 +36,98 @@ SAMPLE_DATA = {
 }
 
 
-def test_generates_valid_html():
-    """Test that function returns valid HTML string."""
-    html = generate_training_plans_section(
-        race_name="SBT GRVL",
-        race_slug="sbt-grvl",
-        race_challenge="altitude demands"
-    )
-    assert isinstance(html, str), "Should return string"
-    assert len(html) > 1000, "Should return substantial HTML"
-    print("✓ Generates valid HTML")
-
-
-def test_contains_section_structure():
-    """Test that HTML contains required section structure."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "altitude demands")
-    assert 'id="training"' in html, "Missing section ID"
-    assert 'training-section' in html, "Missing section class"
-    print("✓ Contains section structure")
-
-
-def test_contains_header_elements():
-    """Test that HTML contains header elements."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "altitude demands")
-    assert 'Training Plans' in html, "Missing Training Plans badge"
-    assert 'Your Plan. Built for You.' in html, "Missing title"
-    assert 'SBT GRVL' in html, "Missing race name"
-    print("✓ Contains header elements")
+@pytest.fixture(scope="module")
+def sample_html():
+    """SBT GRVL section rendered once and shared by the content tests."""
+    return generate_training_plans_section("SBT GRVL", "sbt-grvl", "altitude demands and climbing")
 
 
-def test_race_challenge_in_subtitle():
-    """Test that race challenge appears in subtitle."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "altitude demands and climbing")
-    assert 'altitude demands and climbing' in html, "Missing race challenge in subtitle"
-    print("✓ Race challenge in subtitle")
+def test_generates_valid_html(sample_html):
+    """Test that function returns valid HTML string."""
+    assert isinstance(sample_html, str), "Should return string"
+    assert len(sample_html) > 1000, "Should return substantial HTML"
+
+
+def test_no_surrounding_whitespace(sample_html):
+    """Test that HTML is emitted without leading/trailing whitespace."""
+    assert sample_html.startswith('<section'), "Should start with section tag"
+    assert sample_html.endswith('</section>'), "Should end with section tag"
+
+
+@pytest.mark.parametrize("needle", [
+    # Section structure
+    'id="training"', 'training-section',
+    # Header
+    'Training Plans', 'Your Plan. Built for You.', 'SBT GRVL',
+    'altitude demands and climbing',
+    # Questionnaire CTA
+    "https://wattgod.github.io/training-plans-component/training-plan-questionnaire.html?race=sbt-grvl",
+    'Build My Training Plan', 'cta-button',
+    # 3-step process
+    'Fill Out the Questionnaire', 'I Build Your Plan', 'Train With Confidence',
+    'process-step',
+    # Includes checklist
+    'Workouts for head unit or Zwift', '35,000+ word gravel manual',
+    'Heat, fueling, pacing playbooks', 'Race-specific strategy',
+    # Device list
+    'Garmin', 'Wahoo', 'TrainingPeaks',
+    # Inline CSS
+    '<style>', '.training-section', '.cta-button', '.process-step',
+])
+def test_html_contains(sample_html, needle):
+    """Test that the rendered section contains each expected fragment."""
+    assert needle in sample_html, f"Missing {needle!r}"
+
+
+@pytest.mark.parametrize("needle", ['$199', 'one-time'])
+def test_price_not_displayed(sample_html, needle):
+    """Test that price is NOT displayed (removed per requirements)."""
+    assert needle not in sample_html, "Price should not be displayed"
 
 
-def test_questionnaire_url_correct():
-    """Test that questionnaire URL is correctly formed."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    expected_url = "https://wattgod.github.io/training-plans-component/training-plan-questionnaire.html?race=sbt-grvl"
-    assert expected_url in html, "Missing or incorrect questionnaire URL"
-    print("✓ Questionnaire URL correct")
+def test_same_day_delivery(sample_html):
+    """Test that same-day delivery is mentioned."""
+    assert 'same day' in sample_html.lower(), "Missing same-day delivery mention"
 
 
-def test_cta_button_present():
-    """Test that CTA button is present."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
+def test_linked_css():
+    """Test that inline_css=False links the stylesheet instead of inlining it."""
+    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test", inline_css=False)
+    assert '<style>' not in html, "Style block should not be inlined"
+    assert '<link rel="stylesheet" href="/static/training-plans.css">' in html, "Missing stylesheet link"
     assert 'Build My Training Plan' in html, "Missing CTA button text"
-    assert 'cta-button' in html, "Missing CTA button class"
-    print("✓ CTA button present")
 
 
-def test_price_not_displayed():
-    """Test that price is NOT displayed (removed per requirements)."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert '$199' not in html, "Price should not be displayed"
-    assert 'one-time' not in html, "Price text should not be displayed"
-    print("✓ Price correctly removed")
+def test_write_css_file(tmp_path):
+    """Test that the standalone stylesheet contains the section CSS."""
+    css_path = tmp_path / "training-plans.css"
+    write_training_plans_css(css_path)
+    css = css_path.read_text(encoding="utf-8")
+    assert '.training-section' in css, "Missing section CSS"
+    assert '<style>' not in css, "Stylesheet should not contain style tags"
+    assert css in get_training_plans_css(), "Stylesheet should match inline CSS"
 
 
-def test_same_day_delivery():
-    """Test that same-day delivery is mentioned."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert 'same day' in html.lower(), "Missing same-day delivery mention"
-    print("✓ Same-day delivery mentioned")
-
-
-def test_three_step_process():
-    """Test that 3-step process is rendered."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert 'Fill Out the Questionnaire' in html, "Missing step 1"
-    assert 'I Build Your Plan' in html, "Missing step 2"
-    assert 'Train With Confidence' in html, "Missing step 3"
-    assert 'process-step' in html, "Missing process step class"
-    print("✓ Three-step process rendered")
-
-
-def test_includes_checklist():
-    """Test that includes checklist is present with updated text."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert 'Workouts for head unit or Zwift' in html, "Missing workouts include"
-    assert '35,000+ word gravel manual' in html, "Missing manual include"
-    assert 'Heat, fueling, pacing playbooks' in html, "Missing playbooks include"
-    assert 'Race-specific strategy' in html, "Missing strategy include"
-    print("✓ Includes checklist present")
-
-
-def test_device_list():
-    """Test that device compatibility list is present."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert 'Garmin' in html, "Missing Garmin"
-    assert 'Wahoo' in html, "Missing Wahoo"
-    assert 'TrainingPeaks' in html, "Missing TrainingPeaks"
-    print("✓ Device list present")
-
-
-def test_css_included():
-    """Test that CSS is included inline with correct class names."""
-    html = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
-    assert '<style>' in html, "Missing style tag"
-    assert '.training-section' in html, "Missing section CSS"
-    assert '.cta-button' in html, "Missing button CSS"
-    assert '.process-step' in html, "Missing process step CSS"
-    print("✓ CSS included inline")
+def test_dynamic_values_escaped():
+    """Test that race values are HTML-escaped and the slug is URL-encoded."""
+    html = generate_training_plans_section("<b>Race</b>", "a b&c", "mud & <rain>")
+    assert '<b>Race</b>' not in html, "Race name should be escaped"
+    assert '&lt;b&gt;Race&lt;/b&gt;' in html, "Missing escaped race name"
+    assert 'mud &amp; &lt;rain&gt;' in html, "Missing escaped race challenge"
+    assert '?race=a+b%26c"' in html, "Slug should be URL-encoded"
+
+
+def test_bytes_matches_str(sample_html):
+    """Test that the bytes variant is the UTF-8 encoding of the str output."""
+    html_bytes = generate_training_plans_section_bytes("SBT GRVL", "sbt-grvl", "altitude demands and climbing")
+    assert isinstance(html_bytes, bytes), "Should return bytes"
+    assert html_bytes == sample_html.encode("utf-8"), "Bytes should match encoded HTML"
+
+
+def test_generate_from_spec(sample_html):
+    """Test that rendering from a spec matches the positional API."""
+    spec = TrainingPlansSpec("SBT GRVL", "sbt-grvl", "altitude demands and climbing")
+    assert generate_from(spec) == sample_html, "Spec render should match section render"
 
 
 def test_generate_from_data_dict():
@@ -140,7 +136,6 @@ def test_generate_from_data_dict():
     assert 'SBT GRVL' in html, "Missing race name"
     assert 'sbt-grvl' in html, "Missing race slug in URL"
     assert 'altitude demands' in html, "Missing race challenge"
-    print("✓ Generate from data dict works")
 
 
 def test_fallback_without_tagline():
@@ -157,63 +152,57 @@ def test_fallback_without_tagline():
     }
     html = generate_training_plans_html(data_without_tagline)
     assert 'the heat is brutal' in html.lower(), "Should fallback to signature_challenge"
-    print("✓ Fallback without tagline works")
-
-
-def run_all_tests():
-    """Run all tests and report results."""
-    tests = [
-        test_generates_valid_html,
-        test_contains_section_structure,
-        test_contains_header_elements,
-        test_race_challenge_in_subtitle,
-        test_questionnaire_url_correct,
-        test_cta_button_present,
-        test_price_not_displayed,
-        test_same_day_delivery,
-        test_three_step_process,
-        test_includes_checklist,
-        test_device_list,
-        test_css_included,
-        test_generate_from_data_dict,
-        test_fallback_without_tagline,
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    print("\n" + "=" * 50)
-    print("TRAINING PLANS SECTION TESTS (On-Demand Model)")
-    print("=" * 50 + "\n")
-    
-    for test in tests:
-        try:
-            test()
-            passed += 1
-        except AssertionError as e:
-            print(f"✗ {test.__name__}: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"✗ {test.__name__}: Unexpected error - {e}")
-            failed += 1
-    
-    print("\n" + "=" * 50)
-    print(f"Results: {passed} passed, {failed} failed")
-    print("=" * 50)
-    
-    if failed == 0:
-        print("\n✅ ALL TESTS PASSED")
-        print("\nOn-demand model verified:")
-        print("  ✅ Single CTA → questionnaire")
-        print("  ✅ Price removed (shown later)")
-        print("  ✅ Same-day delivery")
-        print("  ✅ Race-specific challenge tagline")
-        print("  ✅ Updated includes (35k+ word manual, playbooks)")
-        print("  ✅ Simplified class names (training-section, cta-block)")
-    else:
-        print(f"\n❌ {failed} TEST(S) FAILED")
-        sys.exit(1)
+
+
+def test_race_name_fallback():
+    """Test that an empty or missing display_name falls back to name."""
+    for display_name in ("", None):
+        data = {"race": {"name": "Fallback Race", "display_name": display_name, "slug": "fallback-race"}}
+        html = generate_training_plans_html(data)
+        assert 'Fallback Race' in html, "Should fall back to name"
+    html = generate_training_plans_html({"race": {"slug": "nameless-race"}})
+    assert 'This Race' in html, "Should fall back to default name"
+
+
+def test_null_slug_and_non_string_values():
+    """Test that JSON nulls and non-string values still render."""
+    data = {"race": {"display_name": "Null Slug Race", "slug": None, "race_challenge_tagline": 5}}
+    html = generate_training_plans_html(data)
+    assert '?race=race"' in html, "Null slug should fall back to 'race'"
+    assert '</strong> 5.</p>' in html, "Non-string tagline should be stringified"
+    for tagline in (1, True, 1.0, ["mud", "heat"]):
+        data = {"race": {"display_name": "Typed Race", "slug": "typed-race", "race_challenge_tagline": tagline}}
+        html = generate_training_plans_html(data)
+        expected = escape(str(tagline))
+        assert f'</strong> {expected}.</p>' in html, f"Tagline {tagline!r} should render as its own text"
+
+
+def test_fallback_without_course_description():
+    """Test ultimate fallback when neither tagline nor course data exist."""
+    data_without_course = {
+        "race": {
+            "display_name": "Bare Race",
+            "slug": "bare-race"
+        }
+    }
+    html = generate_training_plans_html(data_without_course)
+    assert 'unique demands and challenging terrain' in html, "Should use ultimate fallback"
+
+
+def test_fallback_tracks_course_data_per_render():
+    """Test that races sharing a slug each render their own course data."""
+    for challenge in ("Sticky Mud", "Blistering Heat"):
+        data = {"race": {"slug": "shared-slug", "course_description": {"signature_challenge": challenge}}}
+        html = generate_training_plans_html(data)
+        assert challenge.lower() in html, f"Should render current course data {challenge!r}"
+
+
+def test_repeat_render_is_cached():
+    """Test that rendering the same race twice reuses the cached HTML."""
+    first = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
+    second = generate_training_plans_section("SBT GRVL", "sbt-grvl", "test")
+    assert first is second, "Repeat render should hit the cache"
 
 
 if __name__ == '__main__':
-    run_all_tests()
+    sys.exit(pytest.main([__file__, "-v"]))
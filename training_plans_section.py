@@ -14,103 +14,18 @@ Usage:
     )
 """
 
-from typing import Dict, Optional
+from __future__ import annotations
 
-
-def generate_training_plans_section(
-    race_name: str,
-    race_slug: str,
-    race_challenge: str
-) -> str:
-    """
-    Generate Training Plans section HTML.
-    
-    Args:
-        race_name: Display name of the race (e.g., "SBT GRVL")
-        race_slug: URL-safe race identifier (e.g., "sbt-grvl")
-        race_challenge: Race-specific challenge description for subtitle
-                        (e.g., "altitude demands and 8,000+ feet of climbing")
-    
-    Returns:
-        Complete HTML string for the Training Plans section
-    """
-    
-    questionnaire_url = f"https://wattgod.github.io/training-plans-component/training-plan-questionnaire.html?race={race_slug}"
-    
-    html = f"""<section class="training-section" id="training">
-
-{get_training_plans_css()}
-
-  <!-- Section Header -->
-  <div class="section-header">
-    <div class="section-badge">◆ Training Plans</div>
-    <h2 class="section-title">Your Plan. Built for You.</h2>
-    <p class="section-subtitle">We build a plan calibrated to <strong>{race_name}'s</strong> {race_challenge}.</p>
-  </div>
-  
-  <!-- 3-Step Process -->
-  <div class="process-row">
-    <div class="process-step">
-      <div class="process-number">1</div>
-      <h3>Fill Out the Questionnaire</h3>
-      <p>Hours per week, race goals, schedule constraints, injury history. Takes 5 minutes.</p>
-    </div>
-    <div class="process-step">
-      <div class="process-number">2</div>
-      <h3>I Build Your Plan</h3>
-      <p>A custom training plan structured around YOUR life with workouts you can upload to any device or platform.</p>
-      <p class="device-list">Garmin · Wahoo · Hammerhead · Zwift · TrainerRoad · TrainingPeaks</p>
-    </div>
-    <div class="process-step">
-      <div class="process-number">3</div>
-      <h3>Train With Confidence</h3>
-      <p>Personalized guide with race strategy, fueling, pacing, and race-day execution.</p>
-    </div>
-  </div>
-  
-  <!-- CTA Block -->
-  <div class="cta-block">
-    <h3>Ready to Build Your {race_name} Plan?</h3>
-    
-    <a href="{questionnaire_url}" class="cta-button" target="_blank">
-      Build My Training Plan →
-    </a>
-    
-    <div class="includes-row">
-      <div class="includes-item">
-        <div class="includes-icon">✓</div>
-        <span>Workouts for head unit or Zwift</span>
-      </div>
-      <div class="includes-item">
-        <div class="includes-icon">✓</div>
-        <span>35,000+ word gravel manual</span>
-      </div>
-      <div class="includes-item">
-        <div class="includes-icon">✓</div>
-        <span>Heat, fueling, pacing playbooks</span>
-      </div>
-      <div class="includes-item">
-        <div class="includes-icon">✓</div>
-        <span>Race-specific strategy</span>
-      </div>
-    </div>
-    
-    <div class="cta-footer">
-      <div class="cta-delivery">Plans delivered same day.</div>
-    </div>
-  </div>
-  
-</section>"""
-    
-    return html.strip()
+import re
+from collections import namedtuple
+from functools import lru_cache, partial
+from html import escape
+from pathlib import Path
+from urllib.parse import quote_plus
 
 
-def get_training_plans_css() -> str:
-    """
-    Return the CSS for the Training Plans section.
-    Included inline with the component.
-    """
-    return """<style>
+# Source CSS for the section, kept readable here and minified once at import.
+_RAW_CSS: str = """
 /* Training Plans Section - On-Demand Model */
 .training-section {
   max-width: 1000px;
@@ -347,10 +262,293 @@ def get_training_plans_css() -> str:
     font-size: 28px;
   }
 }
-</style>"""
+"""
+
+
+def _minify_css(src: str) -> str:
+    """
+    Strip comments and redundant whitespace/semicolons from CSS.
+    Runs once at import; the result is what ships in every section.
+    """
+    css = re.sub(r'/\*.*?\*/', '', src, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+_TRAINING_PLANS_CSS_MIN: str = _minify_css(_RAW_CSS)
+_TRAINING_PLANS_CSS: str = "<style>" + _TRAINING_PLANS_CSS_MIN + "</style>"
+
+# Questionnaire URL up to the race slug
+_Q_URL_PREFIX = "https://wattgod.github.io/training-plans-component/training-plan-questionnaire.html?race="
+
+# Where the standalone stylesheet is served when sections don't inline it
+_CSS_HREF = "/static/training-plans.css"
+_CSS_LINK: str = f'<link rel="stylesheet" href="{_CSS_HREF}">'
+
+
+# Section markup with $race_name/$race_challenge/$questionnaire_url placeholders
+# and a $css slot that is filled in once below. No leading or trailing
+# whitespace, so the joined output never needs stripping.
+_SECTION_SKELETON = """<section class="training-section" id="training">
+
+$css
+
+  <!-- Section Header -->
+  <div class="section-header">
+    <div class="section-badge">◆ Training Plans</div>
+    <h2 class="section-title">Your Plan. Built for You.</h2>
+    <p class="section-subtitle">We build a plan calibrated to <strong>$race_name's</strong> $race_challenge.</p>
+  </div>
+  
+  <!-- 3-Step Process -->
+  <div class="process-row">
+    <div class="process-step">
+      <div class="process-number">1</div>
+      <h3>Fill Out the Questionnaire</h3>
+      <p>Hours per week, race goals, schedule constraints, injury history. Takes 5 minutes.</p>
+    </div>
+    <div class="process-step">
+      <div class="process-number">2</div>
+      <h3>I Build Your Plan</h3>
+      <p>A custom training plan structured around YOUR life with workouts you can upload to any device or platform.</p>
+      <p class="device-list">Garmin · Wahoo · Hammerhead · Zwift · TrainerRoad · TrainingPeaks</p>
+    </div>
+    <div class="process-step">
+      <div class="process-number">3</div>
+      <h3>Train With Confidence</h3>
+      <p>Personalized guide with race strategy, fueling, pacing, and race-day execution.</p>
+    </div>
+  </div>
+  
+  <!-- CTA Block -->
+  <div class="cta-block">
+    <h3>Ready to Build Your $race_name Plan?</h3>
+    
+    <a href="$questionnaire_url" class="cta-button" target="_blank">
+      Build My Training Plan →
+    </a>
+    
+    <div class="includes-row">
+      <div class="includes-item">
+        <div class="includes-icon">✓</div>
+        <span>Workouts for head unit or Zwift</span>
+      </div>
+      <div class="includes-item">
+        <div class="includes-icon">✓</div>
+        <span>35,000+ word gravel manual</span>
+      </div>
+      <div class="includes-item">
+        <div class="includes-icon">✓</div>
+        <span>Heat, fueling, pacing playbooks</span>
+      </div>
+      <div class="includes-item">
+        <div class="includes-icon">✓</div>
+        <span>Race-specific strategy</span>
+      </div>
+    </div>
+    
+    <div class="cta-footer">
+      <div class="cta-delivery">Plans delivered same day.</div>
+    </div>
+  </div>
+  
+</section>"""
+
+# Dynamic placeholders in the order they appear in the skeleton; the static
+# chunks from _bake() interleave with values in exactly this order.
+_PLACEHOLDER_ORDER = ('race_name', 'race_challenge', 'race_name', 'questionnaire_url')
+
+
+def _bake(css_block: str) -> tuple:
+    """
+    Fill the $css slot (a plain str.replace) and split the section at its
+    remaining placeholders, so a render is a single join of nine pieces.
+    $-placeholders leave the braces in the CSS alone.
+    """
+    return tuple(re.split(
+        r"\$(?:race_name|race_challenge|questionnaire_url)",
+        _SECTION_SKELETON.replace("$css", css_block)
+    ))
+
+
+# Fail at import if the skeleton's placeholders drift from _PLACEHOLDER_ORDER
+if tuple(re.findall(
+    r"\$(race_name|race_challenge|questionnaire_url)", _SECTION_SKELETON
+)) != _PLACEHOLDER_ORDER:
+    raise RuntimeError("Training plans skeleton placeholders out of sync with _PLACEHOLDER_ORDER")
+
+
+# Static chunks with the <style> block inlined, and with a <link> instead
+_STATIC_CHUNKS: tuple = _bake(_TRAINING_PLANS_CSS)
+_STATIC_CHUNKS_LINKED: tuple = _bake(_CSS_LINK)
+_STATIC_CHUNKS_BYTES: tuple = tuple(chunk.encode("utf-8") for chunk in _STATIC_CHUNKS)
+_STATIC_CHUNKS_LINKED_BYTES: tuple = tuple(
+    chunk.encode("utf-8") for chunk in _STATIC_CHUNKS_LINKED
+)
+
+
+@lru_cache(maxsize=512)
+def _escape_text(text: str) -> str:
+    """HTML-escape a dynamic value (including quotes) before it hits the markup."""
+    return escape(text, quote=True)
+
+
+@lru_cache(maxsize=512)
+def _quote_slug(race_slug: str) -> str:
+    """Percent-encode a race slug for use in the questionnaire query string."""
+    return quote_plus(race_slug)
+
+
+# Inputs for one section. Hashable, so batch drivers can build specs once
+# and reuse them as cache keys.
+TrainingPlansSpec = namedtuple('TrainingPlansSpec', ['race_name', 'race_slug', 'race_challenge'])
+
+
+def _section_values(spec: TrainingPlansSpec) -> tuple:
+    """
+    Escape/encode a spec's dynamic values and return them in
+    _PLACEHOLDER_ORDER, ready to interleave with the static chunks.
+    """
+    race_name = _escape_text(spec.race_name)
+    return (
+        race_name,
+        _escape_text(spec.race_challenge),
+        race_name,
+        _Q_URL_PREFIX + _quote_slug(spec.race_slug),
+    )
+
+
+@lru_cache(maxsize=256)
+def generate_from(spec: TrainingPlansSpec, inline_css: bool = True) -> str:
+    """
+    Generate Training Plans section HTML from a TrainingPlansSpec.
+    
+    race_name and race_challenge are HTML-escaped; race_slug is URL-encoded.
+    Results are memoized per (spec, inline_css), so re-rendering the same
+    race in a batch build is a cache lookup.
+    """
+    values = _section_values(spec)
+    chunks = _STATIC_CHUNKS if inline_css else _STATIC_CHUNKS_LINKED
+    
+    return "".join((
+        chunks[0], values[0],
+        chunks[1], values[1],
+        chunks[2], values[2],
+        chunks[3], values[3],
+        chunks[4]
+    ))
+
+
+def generate_training_plans_section(
+    race_name: str,
+    race_slug: str,
+    race_challenge: str,
+    inline_css: bool = True
+) -> str:
+    """
+    Generate Training Plans section HTML.
+    
+    Args:
+        race_name: Display name of the race (e.g., "SBT GRVL")
+        race_slug: URL-safe race identifier (e.g., "sbt-grvl")
+        race_challenge: Race-specific challenge description for subtitle
+                        (e.g., "altitude demands and 8,000+ feet of climbing")
+        inline_css: Embed the <style> block (default). If False, emit a
+                    <link> to the stylesheet written by write_training_plans_css()
+    
+    Returns:
+        Complete HTML string for the Training Plans section
+    """
+    # Stringify before the caches: 1, 1.0 and True are equal keys there
+    spec = TrainingPlansSpec(str(race_name), str(race_slug), str(race_challenge))
+    return generate_from(spec, inline_css)
 
 
-def generate_training_plans_html(data: Dict) -> str:
+def generate_from_bytes(spec: TrainingPlansSpec, inline_css: bool = True) -> bytes:
+    """
+    Generate Training Plans section HTML from a TrainingPlansSpec as UTF-8 bytes.
+    
+    Same output as generate_from(spec).encode("utf-8"), but the static
+    template is encoded once at import, so only the short dynamic values
+    are encoded per call. Not memoized: the escape helpers are cached, and
+    a second cache of ~5 KB results would duplicate generate_from's.
+    
+    bytes.join sizes the result once and memcpys each piece, which is
+    already what a native template-fill would do; what remains per call is
+    escaping a few short strings, so a C/Cython extension isn't worth a
+    build step.
+    """
+    race_name, race_challenge, _, questionnaire_url = _section_values(spec)
+    race_name_bytes = race_name.encode("utf-8")
+    chunks = _STATIC_CHUNKS_BYTES if inline_css else _STATIC_CHUNKS_LINKED_BYTES
+    
+    return b"".join((
+        chunks[0], race_name_bytes,
+        chunks[1], race_challenge.encode("utf-8"),
+        chunks[2], race_name_bytes,
+        chunks[3], questionnaire_url.encode("utf-8"),
+        chunks[4]
+    ))
+
+
+def generate_training_plans_section_bytes(
+    race_name: str,
+    race_slug: str,
+    race_challenge: str,
+    inline_css: bool = True
+) -> bytes:
+    """
+    Generate Training Plans section HTML as UTF-8 bytes.
+    Use when writing straight to a file or socket.
+    """
+    spec = TrainingPlansSpec(str(race_name), str(race_slug), str(race_challenge))
+    return generate_from_bytes(spec, inline_css)
+
+
+def get_training_plans_css() -> str:
+    """
+    Return the CSS for the Training Plans section.
+    Included inline with the component.
+    """
+    return _TRAINING_PLANS_CSS
+
+
+def write_training_plans_css(path: Path) -> None:
+    """
+    Write the section stylesheet for use with inline_css=False.
+    
+    Call once at the start of a static-site build and serve the file at
+    /static/training-plans.css.
+    """
+    Path(path).write_text(_TRAINING_PLANS_CSS_MIN, encoding="utf-8")
+
+
+# Ultimate fallback when a race has no tagline or course description
+_FALLBACK_CHALLENGE = "unique demands and challenging terrain"
+
+
+@lru_cache(maxsize=512)
+def _lower(text: str) -> str:
+    """Lowercase course text once per distinct value across a batch build."""
+    return text.lower()
+
+
+def _derive_challenge(race: dict) -> str:
+    """
+    Derive a challenge description from course_description when the race
+    has no race_challenge_tagline.
+    """
+    # Fallback: derive from course_description.signature_challenge or character
+    course = race.get('course_description')
+    if course:
+        source = course.get('signature_challenge') or course.get('character')
+        if source:
+            return _lower(source)
+    return _FALLBACK_CHALLENGE
+
+
+def generate_training_plans_html(data: dict, inline_css: bool = True) -> str:
     """
     Generate Training Plans section from race data dict.
     
@@ -359,37 +557,65 @@ def generate_training_plans_html(data: Dict) -> str:
     
     Args:
         data: Race data dictionary with 'race' key
+        inline_css: Passed through to generate_training_plans_section()
     
     Returns:
         Complete HTML string for the Training Plans section
     """
     race = data['race']
-    race_name = race.get('display_name', race.get('name', 'This Race'))
-    race_slug = race.get('slug', 'race')
+    race_name = race.get('display_name') or race.get('name') or 'This Race'
+    race_slug = race.get('slug') or 'race'
     
     # Get race_challenge_tagline from data, or derive from course character
     race_challenge = race.get('race_challenge_tagline')
     
     if not race_challenge:
-        # Fallback: derive from course_description.signature_challenge or character
-        course = race.get('course_description', {})
-        if course.get('signature_challenge'):
-            race_challenge = course['signature_challenge'].lower()
-        elif course.get('character'):
-            race_challenge = course['character'].lower()
-        else:
-            # Ultimate fallback
-            race_challenge = "unique demands and challenging terrain"
+        race_challenge = _derive_challenge(race)
     
     return generate_training_plans_section(
         race_name=race_name,
         race_slug=race_slug,
-        race_challenge=race_challenge
+        race_challenge=race_challenge,
+        inline_css=inline_css
     )
 
 
+# Below this many races, process start-up costs more than it saves
+_BATCH_PARALLEL_THRESHOLD = 50
+
+
+def generate_training_plans_html_batch(
+    datas: list[dict],
+    max_workers: int | None = None,
+    inline_css: bool = True
+) -> list[str]:
+    """
+    Generate Training Plans sections for many races.
+    
+    Renders are CPU-bound string work, so large batches are fanned out
+    across processes; small batches run serially in this process.
+    
+    Args:
+        datas: List of race data dictionaries, each with a 'race' key
+        max_workers: Process count (defaults to the number of CPUs)
+        inline_css: Passed through to generate_training_plans_section()
+    
+    Returns:
+        HTML strings in the same order as datas
+    """
+    render = partial(generate_training_plans_html, inline_css=inline_css)
+    if len(datas) < _BATCH_PARALLEL_THRESHOLD:
+        return [render(data) for data in datas]
+    
+    # Imported here: multiprocessing is the bulk of this module's import time
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(render, datas, chunksize=16))
+
+
 # For backwards compatibility with existing generate_landing_page.py
-def build_training_plans_data(race: Dict) -> Dict:
+def build_training_plans_data(race: dict) -> dict:
     """
     Legacy function - kept for compatibility but no longer needed.
     The new model doesn't use tier cards.